@@ -1,9 +1,13 @@
 # GranulatorApp/audio/audio_loader.py
 
-import librosa
+import soundfile as sf
 import numpy as np
 import os
 
+# Formats libsndfile decodes natively; everything else (e.g. mp3) falls back to librosa.
+SOUNDFILE_EXTENSIONS = ('.wav', '.flac', '.ogg')
+
+
 class AudioLoader:
     """
     A static class responsible for loading audio files into a NumPy array
@@ -13,7 +17,11 @@ class AudioLoader:
     @staticmethod
     def load_audio(filepath: str) -> tuple[np.ndarray | None, int | None]:
         """
-        Loads an audio file from the given filepath using librosa.
+        Loads an audio file from the given filepath.
+
+        PCM formats (WAV, FLAC, OGG) are read directly with soundfile, which
+        decodes via libsndfile and avoids librosa's heavy import and first-call
+        JIT warmup. Other formats (e.g. MP3) fall back to librosa.
 
         Args:
             filepath (str): The full path to the audio file (e.g., .wav, .mp3).
@@ -30,10 +38,20 @@ class AudioLoader:
             return None, None
 
         try:
-            # librosa.load can handle various formats (WAV, MP3, FLAC, OGG, etc.)
-            # It automatically resamples to 22050 Hz by default.
-            # Set sr=None to load at the original sample rate.
-            y, sr = librosa.load(filepath, sr=None)
+            extension = os.path.splitext(filepath)[1].lower()
+            if extension in SOUNDFILE_EXTENSIONS:
+                y, sr = sf.read(filepath, dtype='float32', always_2d=False)
+                if y.ndim > 1:
+                    # Downmix stereo (or more) to mono to match librosa's behaviour.
+                    y = y.mean(axis=1)
+            else:
+                # Deferred import: librosa is only needed for compressed formats.
+                import librosa
+                # Set sr=None to load at the original sample rate.
+                y, sr = librosa.load(filepath, sr=None)
+
+            # Contiguous float32 so the buffer is directly usable for playback without copies.
+            y = np.ascontiguousarray(y, dtype=np.float32)
             print(f"Successfully loaded '{os.path.basename(filepath)}' with sample rate: {sr} Hz")
             return y, sr
         except Exception as e:
@@ -1,9 +1,8 @@
 # GranulatorApp/audio/audio_player.py
 
-import pyaudio
+import sounddevice as sd
 import numpy as np
 import threading
-import time
 
 from PyQt6.QtCore import pyqtSignal, QObject
 
@@ -13,16 +12,16 @@ from utils.constants import DEFAULT_SAMPLE_RATE, AUDIO_BUFFER_SIZE
 
 class AudioPlayer(QObject):
     """
-    Manages real-time audio playback using PyAudio.
-    It runs in a separate thread and continuously requests audio buffers
-    from the GranulatorEngine.
+    Manages real-time audio playback using sounddevice.
+    A dedicated producer thread generates buffers from the GranulatorEngine
+    and pushes them to a write-based OutputStream, so the PortAudio audio
+    thread runs entirely in C code and never executes Python (no GIL
+    contention or GC pauses on the real-time path).
     """
 
     # Custom signals to inform the GUI about playback state
     playback_started_signal = pyqtSignal()
     playback_stopped_signal = pyqtSignal()
-    # NEW: Signal to emit current playback time for waveform visualization
-    playback_progress_signal = pyqtSignal(float)  # Emits current time in seconds
 
     def __init__(self, granulator_engine):
         """
@@ -33,47 +32,76 @@ class AudioPlayer(QObject):
         """
         super().__init__()
         self._granulator_engine = granulator_engine
-        self._pyaudio = pyaudio.PyAudio()
         self._stream = None
+        self._producer_thread = None
         self._is_playing = False
         self._volume = 1.0
 
-        # NEW: Playback position tracker (in frames)
+        # Preallocated output buffer the engine fills in place each callback.
+        self._out_buffer = np.empty(AUDIO_BUFFER_SIZE, dtype=np.float32)
+
+        # Sample rate / source length snapshotted from the engine in play();
+        # the source cannot change mid-playback (loading stops the player
+        # first), so the producer loop avoids cross-object attribute access.
+        self._cached_sample_rate = DEFAULT_SAMPLE_RATE
+        self._cached_total_samples = 0
+
+        # Device-side output latency (seconds), snapshotted from the stream
+        # in play(). The position counter tracks frames handed to PortAudio,
+        # which run ahead of the speakers by this amount.
+        self._output_latency = 0.0
+
+        # Playback position tracker (in frames). Single writer (the producer
+        # thread), read from the GUI thread. A CPython attribute store is
+        # atomic under the GIL, so no lock is needed; readers tolerate
+        # one-buffer staleness.
         self._playback_position_frames = 0
-        # NEW: Lock for thread-safe access to _playback_position_frames
-        self._pos_lock = threading.Lock()
 
         print("AudioPlayer initialized.")
 
-    def _audio_callback(self, in_data, frame_count, time_info, status):
-        """
-        PyAudio callback function. This function is called by PyAudio
-        whenever it needs more audio data.
-        """
-        if self._is_playing:
-            audio_buffer = self._granulator_engine.generate_audio_buffer(frame_count)
-            audio_buffer = audio_buffer * self._volume
-            output_bytes = audio_buffer.astype(np.float32).tobytes()
-
-            # NEW: Update playback position
-            with self._pos_lock:
-                self._playback_position_frames += frame_count
-                # Optionally, loop the playback position if it exceeds total audio length
-                # This depends on how your granulator handles looping.
-                # If granulator loops automatically, the player's cursor might also loop.
-                if self._granulator_engine._audio_data is not None and self._granulator_engine._sample_rate > 0:
-                    total_samples = len(self._granulator_engine._audio_data)
-                    if total_samples > 0:
-                        self._playback_position_frames %= total_samples  # Loop the cursor
-
-            # NEW: Emit playback progress signal
-            # This is critical for updating the waveform viewer's cursor
-            current_time_seconds = self.get_current_playback_time()
-            self.playback_progress_signal.emit(current_time_seconds)
-
-            return output_bytes, pyaudio.paContinue
-        else:
-            return np.zeros(frame_count, dtype=np.float32).tobytes(), pyaudio.paComplete
+    def _producer_loop(self):
+        """
+        Producer thread body. Repeatedly generates granulated buffers and
+        blocks on stream.write(), which provides the pacing: write() only
+        returns when PortAudio has room for the next buffer.
+
+        This is already the decoupled producer/ring-buffer shape: the stream
+        is opened with latency=high, so PortAudio keeps several buffers of
+        lead in its own C-side queue and the hardware callback only copies
+        from it. A Python hiccup (GC, a slow mix) eats into that lead instead
+        of underrunning immediately; an extra Python-side ring would only add
+        latency on top.
+        """
+        # Reused for every buffer: the engine writes into it in place and
+        # stream.write() copies it out before returning, so the producer
+        # loop performs zero allocations in steady state.
+        out_buffer = self._out_buffer
+        while self._is_playing:
+            self._granulator_engine.generate_audio_buffer(AUDIO_BUFFER_SIZE, out_buffer)
+            np.multiply(out_buffer, self._volume, out=out_buffer)
+
+            # Re-check after the (comparatively long) mix: if stop() landed
+            # while we were generating, drop the buffer instead of queueing
+            # another ~46 ms of audio behind the abort.
+            if not self._is_playing:
+                break
+
+            try:
+                self._stream.write(out_buffer)
+            except sd.PortAudioError:
+                # Raised when stop() aborts the stream mid-write; just exit.
+                break
+
+            # Update playback position: compute in a local, publish with a
+            # single atomic attribute store.
+            new_position = self._playback_position_frames + AUDIO_BUFFER_SIZE
+            # Loop the cursor over the source length, mirroring the
+            # granulator's own looping behaviour.
+            if self._cached_total_samples > 0:
+                new_position %= self._cached_total_samples  # Loop the cursor
+            self._playback_position_frames = new_position
+            # No signal emission here: the GUI polls the position from its own
+            # QTimer, so the producer thread never enqueues Qt events.
 
     def play(self):
         """
@@ -91,19 +119,25 @@ class AudioPlayer(QObject):
         self._is_playing = True
         self.playback_started_signal.emit()
 
+        # Snapshot the engine's source properties for the duration of playback.
+        self._cached_sample_rate = self._granulator_engine._sample_rate
+        self._cached_total_samples = len(self._granulator_engine._audio_data)
+
         try:
-            self._stream = self._pyaudio.open(
-                format=pyaudio.paFloat32,
+            self._stream = sd.OutputStream(
+                samplerate=self._cached_sample_rate,
                 channels=1,
-                rate=self._granulator_engine._sample_rate,
-                output=True,
-                frames_per_buffer=AUDIO_BUFFER_SIZE,
-                stream_callback=self._audio_callback
+                dtype='float32',
+                blocksize=AUDIO_BUFFER_SIZE,
+                latency='high'
             )
-            self._stream.start_stream()
-            print("PyAudio stream started.")
+            self._stream.start()
+            self._output_latency = self._stream.latency
+            self._producer_thread = threading.Thread(target=self._producer_loop, daemon=True)
+            self._producer_thread.start()
+            print("sounddevice stream started.")
         except Exception as e:
-            print(f"Error starting PyAudio stream: {e}")
+            print(f"Error starting sounddevice stream: {e}")
             self._is_playing = False
             self.playback_stopped_signal.emit()
             if self._stream:
@@ -119,22 +153,23 @@ class AudioPlayer(QObject):
             return
 
         print("Stopping audio playback...")
-        self._is_playing = False  # Set flag immediately to stop callback
+        self._is_playing = False  # Set flag immediately to stop the producer loop
         self.playback_stopped_signal.emit()
 
         if self._stream:
             try:
-                # Give a small moment for the callback to acknowledge _is_playing change
-                # (though usually not strictly necessary with PyAudio's internal threading)
-                time.sleep(0.01)
-                if self._stream.is_active():  # Only stop if still active
-                    self._stream.stop_stream()
+                # abort() discards queued audio and unblocks a producer
+                # currently waiting inside stream.write().
+                self._stream.abort()
+                if self._producer_thread is not None:
+                    self._producer_thread.join(timeout=1.0)
                 self._stream.close()
-                print("PyAudio stream stopped and closed.")
+                print("sounddevice stream stopped and closed.")
             except Exception as e:
-                print(f"Error stopping/closing PyAudio stream: {e}")
+                print(f"Error stopping/closing sounddevice stream: {e}")
             finally:
                 self._stream = None
+                self._producer_thread = None
 
     def set_volume(self, volume_percent: int):
         """
@@ -145,12 +180,14 @@ class AudioPlayer(QObject):
 
     def get_current_playback_time(self) -> float:
         """
-        Returns the current playback position in seconds.
+        Returns the current playback position in seconds, compensated for the
+        device output latency so the reported time matches what is audible
+        rather than what has been queued.
         """
-        with self._pos_lock:
-            if self._granulator_engine._sample_rate > 0:
-                return self._playback_position_frames / self._granulator_engine._sample_rate
-            return 0.0
+        if self._cached_sample_rate > 0:
+            queued = self._playback_position_frames / self._cached_sample_rate
+            return max(0.0, queued - self._output_latency)
+        return 0.0
 
     def reset_playback(self):
         """
@@ -160,8 +197,7 @@ class AudioPlayer(QObject):
         if self._is_playing:
             self.stop()  # Stop playback first
 
-        with self._pos_lock:
-            self._playback_position_frames = 0  # Reset player's cursor
+        self._playback_position_frames = 0  # Reset player's cursor
         # If your GranulatorEngine has its own internal playback head for
         # source audio advancement that needs to be reset on a player stop/reset,
         # you'd reset it here as well.
@@ -171,9 +207,6 @@ class AudioPlayer(QObject):
 
     def __del__(self):
         """
-        Destructor to ensure PyAudio resources are properly released.
+        Destructor to ensure audio resources are properly released.
         """
         self.stop()  # Ensure stream is stopped
-        if self._pyaudio:
-            self._pyaudio.terminate()
-            print("PyAudio terminated.")
\ No newline at end of file
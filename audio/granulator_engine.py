@@ -1,16 +1,122 @@
 # GranulatorApp/audio/granulator_engine.py
 
+import dataclasses
+from dataclasses import dataclass
+
 import numpy as np
-from scipy.signal.windows import hann  # For applying a window to grains
-import librosa.effects  # For pitch shifting (if you uncomment it later)
-import threading
-import time  # For potential timing in grain generation
+from numba import njit  # JIT-compiled kernels for the per-buffer hot path
+
+# librosa is intentionally NOT imported here: it drags in dozens of modules
+# and costs hundreds of ms of startup. The (currently disabled) pitch-shift
+# path should import librosa.effects lazily at its point of use.
 
 # Import constants for default values
 from utils.constants import DEFAULT_GRAIN_LENGTH_MS, DEFAULT_GRAIN_DENSITY, DEFAULT_SAMPLE_RATE, AUDIO_BUFFER_SIZE
 
 
-class GranulatorEngine:  # ONLY ONE CLASS DEFINITION HERE
+# Maximum number of simultaneously active grains in the preallocated pool.
+MAX_GRAINS = 256
+
+
+def _hann(n: int) -> np.ndarray:
+    """
+    Symmetric Hann window as float32: 0.5 - 0.5*cos(2*pi*k/(n-1)).
+    Matches scipy.signal.windows.hann without pulling scipy into the
+    audio path just for one cosine table.
+    """
+    if n == 1:
+        return np.ones(1, dtype=np.float32)
+    k = np.arange(n, dtype=np.float32)
+    return (0.5 - 0.5 * np.cos(2.0 * np.pi * k / (n - 1))).astype(np.float32)
+
+
+@dataclass(frozen=True)
+class _GranParams:
+    """
+    Immutable snapshot of the granulation parameters plus the values derived
+    from them. Setters build a new instance and publish it with a single
+    attribute store (atomic under the GIL); generate_audio_buffer reads the
+    snapshot once per buffer, so no lock is needed between the GUI and audio
+    threads and a slider move can never stall behind buffer generation.
+    """
+    grain_length_percentage: int = 50
+    grain_density: int = DEFAULT_GRAIN_DENSITY
+    pitch_shift_semitones: float = 0.0
+    overlap_ratio: float = 0.5
+    start_position_percentage: int = 0
+    # Derived values, recomputed whenever a parameter or the source changes.
+    start_position_sample: int = 0
+    grain_length_samples: int = 1
+    loop_start_sample: int = 0
+    loop_end_sample: int = 0
+    loop_duration_samples: int = 1
+
+
+@njit(cache=True, fastmath=True, nogil=True, boundscheck=False)
+def _mix_grains(audio_padded, n, src_starts, cursors, lengths, offsets, window, out, num_frames):
+    """
+    Mixes every active grain into `out`, reading grain samples straight from
+    the wrap-padded source audio and applying the Hann window on the fly.
+    Grain state lives in parallel arrays (structure-of-arrays): a cursor of
+    -1 marks a free pool slot. Cursors are advanced in place and finished
+    grains are released by resetting their cursor to -1. `offsets` staggers
+    a freshly spawned grain to its trigger time within its first buffer
+    (consumed and zeroed after that buffer), so simultaneous spawns no
+    longer pile up at the buffer head.
+
+    `audio_padded` holds the source followed by a full copy of itself, and
+    `n` is the true source length. One modulo normalizes each grain's start
+    into [0, n); since neither grain length nor chunk size can exceed n, the
+    whole read is then a single contiguous run of fused multiply-adds that
+    LLVM can autovectorize — no per-sample wrap handling at all. Windowing
+    and accumulation are fused per grain: stacking grain segments into
+    (grains x frames) matrices for a BLAS reduction would move strictly more
+    memory for the same FLOPs, so the fused loop is the faster formulation.
+
+    Only grains whose length matches `window` are mixed; active grains of
+    other lengths are left untouched and counted, so the caller can re-invoke
+    the kernel with each remaining length's cached window.
+
+    Returns (mixed, skipped): how many grains contributed to this buffer and
+    how many active grains were left for a different window, so callers get
+    both from the same pass without re-scanning the pool.
+
+    Compiled with nogil=True: the GIL is released for the whole mixing loop,
+    so the GUI thread keeps running while the producer thread mixes.
+
+    Deliberately single-threaded: at realistic densities a buffer mixes only
+    a handful of grains, so prange + per-thread partial buffers would cost
+    more in thread fork/join and the final reduction than the mixing itself.
+    """
+    window_length = window.shape[0]
+    mixed_count = 0
+    skipped_count = 0
+    for g in range(cursors.shape[0]):
+        cursor = cursors[g]
+        if cursor < 0:
+            continue
+        length = lengths[g]
+        if length != window_length:
+            # Grain spawned under a different grain length; leave it for a
+            # follow-up call with that length's window so it finishes its
+            # own Hann envelope instead of being cut mid-window.
+            skipped_count += 1
+            continue
+        offset = offsets[g]
+        samples_to_add = min(num_frames - offset, length - cursor)
+        start = (src_starts[g] + cursor) % n
+        for i in range(samples_to_add):
+            out[offset + i] += audio_padded[start + i] * window[cursor + i]
+        offsets[g] = 0
+        mixed_count += 1
+        cursor += samples_to_add
+        if cursor >= length:
+            cursor = -1
+        cursors[g] = cursor
+    return mixed_count, skipped_count
+
+
+class GranulatorEngine:
     """
     The core engine for granular synthesis.
     It takes source audio, applies granulation parameters, and generates
@@ -25,94 +131,212 @@ class GranulatorEngine:  # ONLY ONE CLASS DEFINITION HERE
             audio_data (np.ndarray | None): The initial source audio data.
             sample_rate (int): The sample rate of the audio data.
         """
+        if audio_data is not None:
+            # Guarantee contiguous float32 regardless of the caller: float64
+            # source would upcast the whole mix path and halve SIMD width.
+            audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
         self._audio_data = audio_data
         self._sample_rate = sample_rate
         # Store total audio samples for percentage calculations
         self._total_audio_samples = 0
         if audio_data is not None:
             self._total_audio_samples = len(audio_data)
+        # Wrap-padded copy of the source used by the mix kernel.
+        self._build_padded_audio()
 
-        # Granulation parameters (initialized with defaults)
-        self._grain_length_percentage = 50  # Now percentage (0-100)
-        self._grain_density = DEFAULT_GRAIN_DENSITY  # grains per second
-        self._pitch_shift_semitones = 0.0  # in semitones
-        self._overlap_ratio = 0.5  # overlap between grains (0.0 to 1.0)
+        # Granulation parameters: an immutable snapshot swapped atomically by
+        # the setters (copy-on-write), read once per buffer by the audio thread.
+        self._params = self._derive_params(_GranParams())
 
         # Conceptual playhead position for the granulation engine.
         self._current_loop_playhead_position = 0
 
-        self._start_position_percentage = 0  # Start position from 0-100%
-        self._start_position_sample = 0  # Calculated start position in samples
+        # Preallocated grain pool (structure-of-arrays): source start index,
+        # playback cursor and length per slot. A cursor of -1 marks a free slot.
+        self._allocate_grain_pool()
+
+        # Hann windows cached per grain length. Grain length tracks a slider,
+        # so scrubbing back and forth re-hits previously built windows instead
+        # of recomputing the cosine table. Owned by the audio thread
+        # (generate_audio_buffer), so no locking.
+        self._window_cache: dict[int, np.ndarray] = {}
+
+        # Modern RNG; deviations for a whole buffer are drawn in one call.
+        self._rng = np.random.default_rng()
 
-        # List to hold currently active grains
-        self._active_grains = []
+        # Smoothed headroom gain state (owned by the audio thread).
+        self._smoothed_gain = 1.0
 
-        # Lock for thread-safe access to active_grains and playhead_position
-        self._lock = threading.Lock()
+        # Grains skipped because the pool was full; readable by the GUI.
+        self._dropped_grain_count = 0
 
         print(
-            f"GranulatorEngine initialized. Default grain length: {self._grain_length_percentage}%, Density: {self._grain_density}gps")
+            f"GranulatorEngine initialized. Default grain length: {self._params.grain_length_percentage}%, Density: {self._params.grain_density}gps")
 
     def set_audio_source(self, audio_data: np.ndarray, sample_rate: int):
         """
         Sets or updates the source audio for the granulator.
         Resets the playhead and clears active grains.
+
+        Unlike the parameter setters (one atomic snapshot store), this
+        replaces several attributes in sequence, so callers must stop the
+        player first — AudioPlayer.reset_playback() stops and joins the
+        producer thread before MainWindow calls this.
         """
-        with self._lock:
-            self._audio_data = audio_data
-            self._sample_rate = sample_rate
-            self._total_audio_samples = len(audio_data) if audio_data is not None else 0
+        if audio_data is not None:
+            # Same float32 guarantee as in __init__; keeps the entire mix
+            # path (source, window, output) in one dtype with no upcasts.
+            audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+        self._audio_data = audio_data
+        self._sample_rate = sample_rate
+        self._total_audio_samples = len(audio_data) if audio_data is not None else 0
+        self._build_padded_audio()
 
-            self._active_grains = []
-            self._calculate_start_position_sample()
+        # Fresh pool rather than clearing in place: a buffer being mixed
+        # concurrently keeps the old arrays and simply finishes on them.
+        self._allocate_grain_pool()
+        self._params = self._derive_params(self._params)
 
-            self._current_loop_playhead_position = 0
+        self._current_loop_playhead_position = 0
 
-            if self._audio_data is not None:
-                print(
-                    f"GranulatorEngine: Audio source updated. Length: {self._total_audio_samples / sample_rate:.2f}s, SR: {sample_rate}Hz")
-            else:
-                print("GranulatorEngine: Audio source cleared.")
+        if self._audio_data is not None:
+            print(
+                f"GranulatorEngine: Audio source updated. Length: {self._total_audio_samples / sample_rate:.2f}s, SR: {sample_rate}Hz")
+        else:
+            print("GranulatorEngine: Audio source cleared.")
 
     def set_grain_length_percentage(self, percentage: int):
         """Sets the grain length as a percentage of the total audio length."""
-        with self._lock:
-            self._grain_length_percentage = max(1, min(100, percentage))
-            print(f"GranulatorEngine: Grain length set to {self._grain_length_percentage}%")
+        self._params = self._derive_params(
+            self._params, grain_length_percentage=max(1, min(100, percentage)))
+        print(f"GranulatorEngine: Grain length set to {self._params.grain_length_percentage}%")
 
     def set_grain_density(self, density: int):
         """Sets the grain density in grains per second."""
-        with self._lock:
-            self._grain_density = max(1, density)
-            print(f"GranulatorEngine: Grain density set to {self._grain_density} grains/s")
+        self._params = dataclasses.replace(self._params, grain_density=max(1, density))
+        print(f"GranulatorEngine: Grain density set to {self._params.grain_density} grains/s")
 
-    def set_pitch_shift(self, semitones: float):
-        """Sets the pitch shift in semitones."""
-        with self._lock:
-            self._pitch_shift_semitones = semitones
-            print(f"GranulatorEngine: Pitch shift set to {self._pitch_shift_semitones:.1f} semitones")
+    def set_pitch_shift(self, deci_semitones: int):
+        """
+        Sets the pitch shift from the GUI's raw deci-semitone integer.
+        The division to semitones happens once here, not on every emit.
+        """
+        self._params = dataclasses.replace(self._params, pitch_shift_semitones=deci_semitones * 0.1)
+        print(f"GranulatorEngine: Pitch shift set to {self._params.pitch_shift_semitones:.1f} semitones")
 
     def set_start_position_percentage(self, percentage: int):
         """
         Sets the start position for granulation as a percentage of the audio length.
         """
-        with self._lock:
-            self._start_position_percentage = max(0, min(100, percentage))
-            self._calculate_start_position_sample()
+        self._params = self._derive_params(
+            self._params, start_position_percentage=max(0, min(100, percentage)))
+        self._current_loop_playhead_position = 0
+        print(f"GranulatorEngine: Start Position set to {self._params.start_position_percentage}%")
+
+    def configure(self, *, grain_length_percentage: int | None = None,
+                  grain_density: int | None = None,
+                  pitch_shift_deci_semitones: int | None = None,
+                  start_position_percentage: int | None = None):
+        """
+        Applies several parameters at once through a single snapshot rebuild
+        and one atomic publish, instead of chaining the individual setters
+        (each of which rederives the loop region and republishes). Omitted
+        arguments keep their current values.
+        """
+        overrides = {}
+        if grain_length_percentage is not None:
+            overrides["grain_length_percentage"] = max(1, min(100, grain_length_percentage))
+        if grain_density is not None:
+            overrides["grain_density"] = max(1, grain_density)
+        if pitch_shift_deci_semitones is not None:
+            overrides["pitch_shift_semitones"] = pitch_shift_deci_semitones * 0.1
+        if start_position_percentage is not None:
+            overrides["start_position_percentage"] = max(0, min(100, start_position_percentage))
+        self._params = self._derive_params(self._params, **overrides)
+        if start_position_percentage is not None:
             self._current_loop_playhead_position = 0
-            print(f"GranulatorEngine: Start Position set to {self._start_position_percentage}%")
+        print(f"GranulatorEngine: Configured {', '.join(sorted(overrides))}")
 
-    def _calculate_start_position_sample(self):
+    def _derive_params(self, params: _GranParams, **overrides) -> _GranParams:
         """
-        Calculates the start position in samples based on the percentage
-        and the current audio data length.
+        Returns a new parameter snapshot with `overrides` applied and the
+        derived values (start sample and loop region) recomputed against the
+        current audio source. The caller publishes the result with a single
+        attribute store.
+        """
+        params = dataclasses.replace(params, **overrides)
+
+        total = self._total_audio_samples
+        if total > 0:
+            start_sample = int(total * (params.start_position_percentage / 100.0))
+            start_sample = max(0, min(start_sample, total - 1))
+        else:
+            start_sample = 0
+
+        grain_length_samples = max(1, int(total * (params.grain_length_percentage / 100.0)))
+        loop_end_sample = min(start_sample + grain_length_samples, total)
+        loop_duration_samples = max(1, loop_end_sample - start_sample)
+
+        return dataclasses.replace(
+            params,
+            start_position_sample=start_sample,
+            grain_length_samples=grain_length_samples,
+            loop_start_sample=start_sample,
+            loop_end_sample=loop_end_sample,
+            loop_duration_samples=loop_duration_samples,
+        )
+
+    def _build_padded_audio(self):
+        """
+        Builds the wrap-padded source buffer: the audio followed by a full
+        copy of itself. Grain length and chunk size never exceed the source
+        length, so after one start-index modulo every grain read is a single
+        contiguous slice — the mix kernel needs no per-sample wrap handling.
+        Costs one extra copy of the source in RAM, paid once per load.
+
+        The buffer is kept in float32 deliberately: a float16 copy would
+        halve read bandwidth, but CPU float16 loads are scalarized (no
+        vectorized F16C path in Numba), which costs more than the bandwidth
+        saves at this buffer size. Revisit if the mix ever goes to a native
+        kernel with hardware half-precision conversion.
         """
         if self._audio_data is not None and self._total_audio_samples > 0:
-            self._start_position_sample = int(self._total_audio_samples * (self._start_position_percentage / 100.0))
-            self._start_position_sample = min(self._start_position_sample, self._total_audio_samples - 1)
-            self._start_position_sample = max(0, self._start_position_sample)
+            self._audio_data_padded = np.concatenate((self._audio_data, self._audio_data))
         else:
-            self._start_position_sample = 0
+            self._audio_data_padded = None
+
+    def _allocate_grain_pool(self):
+        """
+        Allocates (or replaces) the fixed-size structure-of-arrays grain pool.
+        int32 keeps all three slot arrays in a handful of cache lines; it
+        comfortably covers source positions for multi-hour files at 44.1 kHz.
+        """
+        self._grain_src_starts = np.zeros(MAX_GRAINS, dtype=np.int32)
+        self._grain_cursors = np.full(MAX_GRAINS, -1, dtype=np.int32)
+        self._grain_lengths = np.zeros(MAX_GRAINS, dtype=np.int32)
+        # Trigger-time offset within a grain's first buffer; zeroed once used.
+        self._grain_offsets = np.zeros(MAX_GRAINS, dtype=np.int32)
+
+    def _get_hann_window(self, grain_length_samples: int) -> np.ndarray:
+        """
+        Returns the Hann window for the given grain length from the per-length
+        cache, computing it on first use. Grain length only moves on slider
+        changes, so in steady state this is a cache hit for every buffer, and
+        revisited slider positions reuse their previously built window.
+        """
+        window = self._window_cache.get(grain_length_samples)
+        if window is None:
+            window = _hann(grain_length_samples)
+            # The slider has ~100 positions per source, but lengths depend on
+            # the loaded file; keep the cache from growing without bound.
+            if len(self._window_cache) > 128:
+                self._window_cache.clear()
+            self._window_cache[grain_length_samples] = window
+        return window
+
+    def get_dropped_grain_count(self) -> int:
+        """Returns how many grains were skipped because the pool was full."""
+        return self._dropped_grain_count
 
     def get_current_loop_region(self) -> tuple[int, int]:
         """
@@ -121,53 +345,41 @@ class GranulatorEngine:  # ONLY ONE CLASS DEFINITION HERE
         if self._audio_data is None or self._sample_rate <= 0 or self._total_audio_samples == 0:
             return 0, 0
 
-        with self._lock:
-            loop_start_sample = self._start_position_sample
-            loop_length_samples = int(self._total_audio_samples * (self._grain_length_percentage / 100.0))
-            if loop_length_samples <= 0: loop_length_samples = 1
-
-            loop_end_sample = min(loop_start_sample + loop_length_samples, self._total_audio_samples)
-
-            return loop_start_sample, loop_end_sample
+        params = self._params
+        return params.loop_start_sample, params.loop_end_sample
 
-    def generate_audio_buffer(self, num_frames: int) -> np.ndarray:
+    def generate_audio_buffer(self, num_frames: int, out: np.ndarray) -> None:
         """
-        Generates a buffer of granulated audio. This method is called repeatedly
-        by the AudioPlayer to get audio data.
+        Generates a buffer of granulated audio into `out`, a caller-owned
+        float32 array of at least `num_frames` samples. Writing in place means
+        the steady-state audio path performs no allocations at all. This
+        method is called repeatedly by the AudioPlayer to get audio data.
         """
-        # Minimize lock: copy all parameters needed
-        with self._lock:
-            audio_data = self._audio_data
-            sample_rate = self._sample_rate
-            total_audio_samples = self._total_audio_samples
-            grain_length_percentage = self._grain_length_percentage
-            grain_density = self._grain_density
-            start_position_sample = self._start_position_sample
-            current_loop_playhead_position = self._current_loop_playhead_position
-            start_position_percentage = self._start_position_percentage
-            # Copy active grains for modification
-            active_grains = list(self._active_grains)
+        # One atomic read of the parameter snapshot; every field used below
+        # comes from this consistent view, so no lock is needed.
+        params = self._params
+        audio_data = self._audio_data
+        audio_data_padded = self._audio_data_padded
+        sample_rate = self._sample_rate
+        total_audio_samples = self._total_audio_samples
+        grain_density = params.grain_density
+        current_loop_playhead_position = self._current_loop_playhead_position
+        loop_start_sample_actual = params.loop_start_sample
+        loop_duration_samples = params.loop_duration_samples
+        # Snapshot the pool arrays; the kernel mutates them in place.
+        grain_src_starts = self._grain_src_starts
+        grain_cursors = self._grain_cursors
+        grain_lengths = self._grain_lengths
+        grain_offsets = self._grain_offsets
+
+        output_buffer = out[:num_frames]
+        output_buffer.fill(0.0)
 
         if audio_data is None or sample_rate <= 0 or total_audio_samples == 0:
-            return np.zeros(num_frames, dtype=np.float32)
+            return
 
-        output_buffer = np.zeros(num_frames, dtype=np.float32)
-
-        audio_length = total_audio_samples
-
-        grain_length_samples = int(audio_length * (grain_length_percentage / 100.0))
-        if grain_length_samples <= 0:
-            grain_length_samples = 1
-
-        # Calculate loop start/end region
-        loop_start_sample_actual = start_position_sample
-        loop_length_samples = int(total_audio_samples * (grain_length_percentage / 100.0))
-        if loop_length_samples <= 0:
-            loop_length_samples = 1
-        loop_end_sample_actual = min(loop_start_sample_actual + loop_length_samples, total_audio_samples)
-        loop_duration_samples = loop_end_sample_actual - loop_start_sample_actual
-        if loop_duration_samples <= 0:
-            loop_duration_samples = 1
+        # Derived once in _derive_params when a parameter or the source moves.
+        grain_length_samples = params.grain_length_samples
 
         if grain_density <= 0:
             grains_to_trigger = 0
@@ -175,6 +387,8 @@ class GranulatorEngine:  # ONLY ONE CLASS DEFINITION HERE
             grains_to_trigger = int(grain_density * (num_frames / sample_rate))
             if grains_to_trigger == 0 and (sample_rate / grain_density) <= num_frames:
                 grains_to_trigger = 1
+            # Hard bound: never ask for more grains than the pool can hold.
+            grains_to_trigger = min(grains_to_trigger, MAX_GRAINS)
 
         # Advance playhead
         current_loop_playhead_position = (current_loop_playhead_position + num_frames)
@@ -183,85 +397,76 @@ class GranulatorEngine:  # ONLY ONE CLASS DEFINITION HERE
         else:
             current_loop_playhead_position = 0
 
-        # Grain triggering
-        for _ in range(grains_to_trigger):
-            grain_base_start_idx_in_loop = current_loop_playhead_position
-
-            deviation_range_samples = int(grain_length_samples * 0.5)
-            deviation_range_samples = max(0, deviation_range_samples)
-
-            if deviation_range_samples == 0:
-                random_deviation = 0
-            else:
-                random_deviation = np.random.randint(-deviation_range_samples, deviation_range_samples + 1)
-
-            grain_source_start_idx = loop_start_sample_actual + grain_base_start_idx_in_loop + random_deviation
-            indices = np.arange(grain_source_start_idx, grain_source_start_idx + grain_length_samples, dtype=int)
-            grain_raw = np.take(audio_data, indices, mode='wrap')
-            window = hann(len(grain_raw))
-            windowed_grain = grain_raw * window
-
-            # Apply pitch shift if necessary (re-enable if desired later)
-            # if self._pitch_shift_semitones != 0.0:
-            #    try:
-            #        windowed_grain_float = windowed_grain.astype(np.float32)
-            #        if windowed_grain_float.size == 0 or sample_rate <= 0:
-            #            pitched_grain = windowed_grain_float
-            #        else:
-            #            pitched_grain = librosa.effects.pitch_shift(
-            #                y=windowed_grain_float,
-            #                sr=sample_rate,
-            #                n_steps=self._pitch_shift_semitones
-            #            )
-            #        if len(pitched_grain) > grain_length_samples:
-            #            windowed_grain = pitched_grain[:grain_length_samples]
-            #        elif len(pitched_grain) < grain_length_samples:
-            #            windowed_grain = np.pad(pitched_grain, (0, grain_length_samples - len(pitched_grain)), mode='constant')
-            #        else:
-            #            windowed_grain = pitched_grain
-            #    except Exception as e:
-            #        print(f"Pitch shift error: {e}. Skipping pitch shift for this grain.")
-            #        windowed_grain = grain_raw * hann(len(grain_raw))
-
-            active_grains.append({
-                'data': windowed_grain,
-                'current_sample': 0,
-                'total_samples': len(windowed_grain)
-            })
-
-        new_active_grains = []
-        for grain in active_grains:
-            grain_data = grain['data']
-            current_sample_in_grain = grain['current_sample']
-            total_samples_in_grain = grain['total_samples']
-
-            remaining_in_grain = total_samples_in_grain - current_sample_in_grain
-            samples_to_add = min(num_frames, remaining_in_grain)
-
-            if samples_to_add > 0:
-                grain_segment = grain_data[current_sample_in_grain: current_sample_in_grain + samples_to_add]
-
-                if len(grain_segment) < samples_to_add:
-                    grain_segment = np.pad(grain_segment, (0, samples_to_add - len(grain_segment)), mode='constant')
-                elif len(grain_segment) > samples_to_add:
-                    grain_segment = grain_segment[:samples_to_add]
-
-                output_buffer[:samples_to_add] += grain_segment
-
-                grain['current_sample'] += samples_to_add
-
-            if grain['current_sample'] < total_samples_in_grain:
-                new_active_grains.append(grain)
-
-        # Write back updated grains and playhead in a short lock
-        with self._lock:
-            self._active_grains = new_active_grains
-            self._current_loop_playhead_position = current_loop_playhead_position
-
-        max_val = np.max(np.abs(output_buffer))
-        if max_val > 1.0e-9:
-            output_buffer /= max_val
-        else:
-            output_buffer = np.zeros_like(output_buffer)
-
-        return output_buffer
\ No newline at end of file
+        # Grain triggering: claim free pool slots (cursor == -1) for new grains.
+        # Grain samples are not materialized here; the mix kernel reads them
+        # straight from the source audio with the window applied on the fly.
+        # (Pitch shifting is currently disabled; pitch_shift_semitones is
+        # retained in the parameter snapshot for a future offline implementation.)
+        window = self._get_hann_window(grain_length_samples)
+        if grains_to_trigger > 0:
+            # Claim free slots (cursor == -1) and write every new grain with
+            # vectorized slot assignments — no Python-level per-grain loop.
+            # Buffers that trigger nothing (the common case at low densities)
+            # skip this block entirely, including the free-slot scan.
+            free_slots = np.flatnonzero(grain_cursors == -1)
+            spawn_count = min(grains_to_trigger, len(free_slots))
+            if spawn_count < grains_to_trigger:
+                self._dropped_grain_count += grains_to_trigger - spawn_count
+            if spawn_count > 0:
+                slots = free_slots[:spawn_count]
+                base_start_idx = loop_start_sample_actual + current_loop_playhead_position
+
+                # All deviations drawn in one batched Generator call.
+                deviation_range_samples = grain_length_samples // 2
+                if deviation_range_samples > 0:
+                    src_starts = base_start_idx + self._rng.integers(
+                        -deviation_range_samples, deviation_range_samples + 1,
+                        size=spawn_count, dtype=np.int32)
+                else:
+                    src_starts = base_start_idx
+
+                grain_src_starts[slots] = src_starts
+                grain_lengths[slots] = grain_length_samples
+                # Stagger spawns evenly across the buffer instead of stacking
+                # them all at sample 0 — restores the intended grain spacing.
+                grain_offsets[slots] = (np.arange(spawn_count, dtype=np.int32)
+                                        * num_frames) // grains_to_trigger
+                grain_cursors[slots] = 0
+
+        # Mix all active grains into the output buffer in one kernel call;
+        # liveness checks, cursor advancement and slot release all happen in
+        # that same pass, which also reports how many grains contributed.
+        active_grain_count, stale_count = _mix_grains(
+            audio_data_padded, total_audio_samples,
+            grain_src_starts, grain_cursors, grain_lengths,
+            grain_offsets, window, output_buffer, num_frames)
+
+        # Grains spawned under a previous grain length keep playing to the
+        # end of their own Hann envelope: one extra kernel call per distinct
+        # remaining length, each with that length's cached window. In steady
+        # state stale_count is 0 and this block never runs; during a
+        # grain-size drag it covers the few buffers where old and new grains
+        # overlap, instead of truncating the old ones mid-window.
+        if stale_count > 0:
+            stale_lengths = np.unique(grain_lengths[(grain_cursors >= 0)
+                                                    & (grain_lengths != grain_length_samples)])
+            for length in stale_lengths:
+                mixed, _ = _mix_grains(
+                    audio_data_padded, total_audio_samples,
+                    grain_src_starts, grain_cursors, grain_lengths,
+                    grain_offsets, self._get_hann_window(int(length)),
+                    output_buffer, num_frames)
+                active_grain_count += mixed
+
+        # Publish the advanced playhead (single atomic attribute store).
+        self._current_loop_playhead_position = current_loop_playhead_position
+
+        # Headroom scaling instead of per-buffer peak normalization, which
+        # pumped audibly and cost two extra full passes over the buffer.
+        # Overlapping Hann grains sum roughly with sqrt(N) energy, so target
+        # 1/sqrt(active count), smoothed with a one-pole so the gain glides
+        # between buffers instead of stepping when grains start or end.
+        target_gain = 1.0 / max(1.0, np.sqrt(active_grain_count))
+        self._smoothed_gain += 0.2 * (target_gain - self._smoothed_gain)
+        output_buffer *= self._smoothed_gain
+        np.clip(output_buffer, -1.0, 1.0, out=output_buffer)
\ No newline at end of file
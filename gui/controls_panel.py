@@ -4,9 +4,68 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QSlider, QLabel, QSpinBox, QGroupBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QRectF
-from PyQt6.QtGui import QPainter, QColor, QFont, QPen
-import math
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QRect, QRectF, QTimer
+from PyQt6.QtGui import QPainter, QColor, QFont, QPen, QBrush, QPixmap
+import numpy as np
+from pathlib import Path
+
+# All panel styling lives in controls_panel.qss and is applied once at the
+# panel root (rules are keyed by objectName), so Qt runs a single repolish
+# pass instead of one per styled widget. The text is cached at module level
+# so re-instantiating the panel skips the disk read.
+_PANEL_QSS_PATH = Path(__file__).with_name("controls_panel.qss")
+_panel_qss_cache = None
+
+
+def _load_panel_qss() -> str:
+    global _panel_qss_cache
+    if _panel_qss_cache is None:
+        _panel_qss_cache = _PANEL_QSS_PATH.read_text()
+    return _panel_qss_cache
+
+
+# Paint resources for Knob, shared by every instance. QColor/QPen/QBrush are
+# plain value types (safe to build before the QApplication exists), and
+# constructing them per knob — let alone per paint — only duplicates
+# identical C++ objects.
+_KNOB_BODY_BRUSH = QBrush(QColor("#3a3a3a"))
+_KNOB_OUTLINE_PEN = QPen(QColor("#555555"))
+_KNOB_INDICATOR_PEN = QPen(QColor("#00aaff"), 3)
+
+
+class _ThrottledEmitter:
+    """
+    Coalesces rapid parameter updates into at most one downstream emit per
+    interval. The first value in a burst is emitted immediately (so the
+    engine reacts without perceptible lag); values arriving while the timer
+    runs only overwrite the pending slot, and the latest one is emitted on
+    timeout. flush() delivers any pending value right away, guaranteeing the
+    final position of a drag is never dropped.
+    """
+
+    def __init__(self, parent, emit_func, interval_ms: int = 50):
+        self._emit_func = emit_func
+        self._pending = None
+        self._timer = QTimer(parent)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._emit_pending)
+
+    def submit(self, value):
+        if self._timer.isActive():
+            self._pending = value
+        else:
+            self._emit_func(value)
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        self._emit_pending()
+
+    def _emit_pending(self):
+        if self._pending is not None:
+            value, self._pending = self._pending, None
+            self._emit_func(value)
 
 
 class Knob(QWidget):
@@ -15,6 +74,7 @@ class Knob(QWidget):
     Emits valueChanged signal when rotated.
     """
     valueChanged = pyqtSignal(int)
+    dragFinished = pyqtSignal()
 
     def __init__(self, min_val: int = 0, max_val: int = 100, initial_val: int = 0, label_text: str = "", parent=None):
         super().__init__(parent)
@@ -27,23 +87,98 @@ class Knob(QWidget):
         # Adjusted height: Now set to a size that's good for JUST the knob,
         # as text will be handled by QLabels in the parent layout.
         self.setFixedSize(80, 80) # Optimal size for the knob itself
-        self.setMouseTracking(True)
+        # Mouse tracking stays off (the QWidget default): move events are
+        # delivered while a button is held regardless, which is the only
+        # state the handlers act on, and hover tracking would dispatch a
+        # Python mouseMoveEvent per pixel for nothing.
         self._dragging = False
         self._last_mouse_y = 0
 
+        self._update_geometry()
+        self._build_endpoint_lut()
+
+        # The knob body never changes between frames, so it is rendered once
+        # into a pixmap and blitted each paint; only the indicator line goes
+        # through the antialiased vector path per frame.
+        self._bg_pixmap = None
+        self._render_background()
+
+    def _update_geometry(self):
+        """
+        Caches everything paintEvent needs that only depends on the widget
+        size (fixed at 80x80, so effectively constant): centre coordinates,
+        radii and the dirty rect used for partial indicator repaints.
+        """
+        rect = self.rect()
+        center = rect.center()
+        self._cx = center.x()
+        self._cy = center.y()
+        self._knob_radius = int(min(rect.width(), rect.height()) / 2.5)
+        self._indicator_radius = self._knob_radius * 0.7
+        # Bounding rect of the indicator line at any angle, padded for the
+        # 3 px pen; the ring outside it never changes with the value.
+        reach = int(self._indicator_radius) + 4
+        self._indicator_region = QRect(self._cx - reach, self._cy - reach, 2 * reach, 2 * reach)
+
+    def _render_background(self):
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setBrush(_KNOB_BODY_BRUSH)
+        painter.setPen(_KNOB_OUTLINE_PEN)
+        painter.drawEllipse(self.rect().center(), self._knob_radius, self._knob_radius)
+        painter.end()
+
+        self._bg_pixmap = pixmap
+
+    def resizeEvent(self, event):
+        self._update_geometry()
+        self._build_endpoint_lut()  # Endpoints scale with the radius
+        self._render_background()
+        super().resizeEvent(event)
+
+    def _build_endpoint_lut(self):
+        """
+        Precomputes the integer indicator endpoint offsets from the centre
+        for every knob value. The endpoint is a pure function of the value
+        and the (fixed) indicator radius, so paintEvent is reduced to two
+        array lookups per frame -- no trig, multiplies or rounding. Rebuilt
+        on setRange and resize.
+        """
+        n = max(self._range, 1)
+        angles = np.radians(225.0 - np.linspace(0.0, 1.0, n + 1) * 270.0)
+        self._dx_lut = np.rint(self._indicator_radius * np.cos(angles)).astype(np.int16)
+        self._dy_lut = np.rint(-self._indicator_radius * np.sin(angles)).astype(np.int16)
+
     def value(self) -> int:
         return self._value
 
     def setValue(self, value: int):
         if self._min_val <= value <= self._max_val and self._value != value:
+            self._setValueInternal(value)
+
+    def _setValueInternal(self, value: int):
+        # Fast path for callers that have already clamped (the drag handler):
+        # skips the public setter's bounds re-check.
+        if self._value != value:
             self._value = value
-            self.update()
+            # A hidden knob (covered panel, minimized window) gets a full
+            # paint on show anyway, so skip scheduling repaints until then.
+            # valueChanged still fires: labels and the engine track the value
+            # regardless of visibility.
+            if self.isVisible():
+                self.update(self._indicator_region)
             self.valueChanged.emit(self._value)
 
     def setRange(self, min_val: int, max_val: int):
         self._min_val = min_val
         self._max_val = max_val
         self._range = max_val - min_val
+        self._build_endpoint_lut()
         if not (self._min_val <= self._value <= self._max_val):
             self.setValue(self._min_val)
         self.update()
@@ -64,41 +199,40 @@ class Knob(QWidget):
             sensitivity = 0.5
             change = int(delta_y * sensitivity)
 
+            # Only consume the motion once it amounts to a whole step.
+            # Leaving _last_mouse_y untouched on a zero-step move keeps the
+            # sub-pixel remainder accumulating (previously it was discarded,
+            # making slow drags feel stiff) and skips the setter entirely.
+            if change == 0:
+                return
+
             new_value = self._value + change
-            self.setValue(max(self._min_val, min(self._max_val, new_value)))
+            self._setValueInternal(max(self._min_val, min(self._max_val, new_value)))
             self._last_mouse_y = event.pos().y()
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self._dragging = False
+            # One final antialiased frame now that the drag is over.
+            self.update(self._indicator_region)
+            self.dragFinished.emit()
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        rect = self.rect()
-        knob_radius = min(rect.width(), rect.height()) / 2.5
-        knob_center = rect.center()
-
-        painter.setBrush(QColor("#3a3a3a"))
-        painter.setPen(QColor("#555555"))
-        # FIX: Cast knob_radius to int for drawEllipse
-        painter.drawEllipse(knob_center, int(knob_radius), int(knob_radius))
+        # Antialiasing roughly doubles the software rasterizer's cost per
+        # draw call, so the moving indicator is drawn aliased while a drag
+        # is active; mouseReleaseEvent schedules a final antialiased frame.
+        # The bezel always looks smooth because its pixmap was rendered
+        # with antialiasing.
+        if not self._dragging:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
-        indicator_radius = knob_radius * 0.7
-        angle_range = 270
-        start_angle = 225
+        painter.drawPixmap(0, 0, self._bg_pixmap)
 
-        normalized_value = (self._value - self._min_val) / self._range if self._range > 0 else 0
-        current_angle = start_angle - (normalized_value * angle_range)
-
-        angle_rad = math.radians(current_angle)
-
-        indicator_x = knob_center.x() + indicator_radius * math.cos(angle_rad)
-        indicator_y = knob_center.y() - indicator_radius * math.sin(angle_rad)
-
-        painter.setPen(QPen(QColor("#00aaff"), 3))
-        painter.drawLine(knob_center.x(), knob_center.y(), int(indicator_x), int(indicator_y))
+        i = self._value - self._min_val
+        painter.setPen(_KNOB_INDICATOR_PEN)
+        painter.drawLine(self._cx, self._cy,
+                         self._cx + self._dx_lut[i], self._cy + self._dy_lut[i])
 
         painter.end()
 
@@ -111,22 +245,37 @@ class ControlsPanel(QWidget):
 
     play_signal = pyqtSignal()
     stop_signal = pyqtSignal()
+    # Emitted once at construction with every parameter, so consumers can run
+    # a single consolidated update instead of five separate ones.
+    parameters_initialized_signal = pyqtSignal(dict)
     grain_size_changed_signal = pyqtSignal(int)
     grain_density_changed_signal = pyqtSignal(int)
-    pitch_shift_changed_signal = pyqtSignal(float)
+    # Raw deci-semitones from the knob; consumers divide by 10 once where the
+    # value is actually used, instead of boxing a float on every emit.
+    pitch_shift_changed_signal = pyqtSignal(int)
     volume_changed_signal = pyqtSignal(int)
     start_position_changed_signal = pyqtSignal(int)
 
     def __init__(self):
         super().__init__()
         self._init_ui()
+        self._init_throttles()
         self._connect_signals()
 
-        self.grain_size_changed_signal.emit(self.grain_size_knob.value())
-        self.grain_density_changed_signal.emit(self.grain_density_knob.value())
-        self.pitch_shift_changed_signal.emit(self.pitch_shift_knob.value() / 10.0)
-        self.volume_changed_signal.emit(self.volume_knob.value())
-        self.start_position_changed_signal.emit(self.start_position_knob.value())
+        self.parameters_initialized_signal.emit(self.current_parameters())
+
+    def current_parameters(self) -> dict:
+        """
+        Returns a snapshot of every knob value, keyed the way downstream
+        consumers expect them.
+        """
+        return {
+            "grain_size": self.grain_size_knob.value(),
+            "grain_density": self.grain_density_knob.value(),
+            "pitch_shift": self.pitch_shift_knob.value(),  # deci-semitones
+            "volume": self.volume_knob.value(),
+            "start_position": self.start_position_knob.value(),
+        }
 
     def _init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -147,20 +296,24 @@ class ControlsPanel(QWidget):
             v_layout.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)  # Align top
 
             knob = Knob(min_val, max_val, initial_val, label_text, parent=self)
-            knob_container = QHBoxLayout()
-            knob_container.addStretch()
-            knob_container.addWidget(knob)
-            knob_container.addStretch()
-            v_layout.addLayout(knob_container)
+            # Centre via the alignment flag instead of a stretch-padded
+            # QHBoxLayout; same result with three fewer layout items per
+            # column for the layout engine to walk on every resize.
+            v_layout.addWidget(knob, 0, Qt.AlignmentFlag.AlignHCenter)
 
             value_label = QLabel(str(initial_val))
+            value_label.setObjectName("knobValue")  # Styled in controls_panel.qss
             value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            value_label.setStyleSheet("font-size: 12px; color: #b0b0b0;")
+            # Fixed width + plain text keeps setText from triggering a layout
+            # pass on every knob tick: the geometry never changes and Qt skips
+            # the rich-text detection on the new string.
+            value_label.setTextFormat(Qt.TextFormat.PlainText)
+            value_label.setFixedWidth(110)  # Same width as the text label below
             v_layout.addWidget(value_label)
 
             text_label = QLabel(label_text)
+            text_label.setObjectName("knobCaption")  # Styled in controls_panel.qss
             text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            text_label.setStyleSheet("font-size: 12px; color: #d0d0d0;")
             text_label.setFixedWidth(110)  # Set a fixed width to prevent wrapping
             text_label.setWordWrap(False)  # Ensure no wrapping
             v_layout.addWidget(text_label)
@@ -194,51 +347,13 @@ class ControlsPanel(QWidget):
         knobs_and_buttons_h_layout.addStretch(1)
 
         self.play_button = QPushButton("Play")
+        self.play_button.setObjectName("playBtn")
         self.play_button.setFixedSize(80, 35)
-        self.play_button.setStyleSheet("""
-            QPushButton {
-                background-color: #007BFF;
-                color: white;
-                border-radius: 8px;
-                font-weight: bold;
-                font-size: 14px;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #0056b3;
-            }
-            QPushButton:pressed {
-                background-color: #004085;
-            }
-            QPushButton:disabled {
-                background-color: #666;
-                color: #aaa;
-            }
-        """)
         knobs_and_buttons_h_layout.addWidget(self.play_button)
 
         self.stop_button = QPushButton("Stop")
+        self.stop_button.setObjectName("stopBtn")
         self.stop_button.setFixedSize(80, 35)
-        self.stop_button.setStyleSheet("""
-            QPushButton {
-                background-color: #DC3545;
-                color: white;
-                border-radius: 8px;
-                font-weight: bold;
-                font-size: 14px;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #c82333;
-            }
-            QPushButton:pressed {
-                background-color: #bd2130;
-            }
-            QPushButton:disabled {
-                background-color: #666;
-                color: #aaa;
-            }
-        """)
         knobs_and_buttons_h_layout.addWidget(self.stop_button)
 
         params_vertical_layout.addLayout(knobs_and_buttons_h_layout)
@@ -247,72 +362,100 @@ class ControlsPanel(QWidget):
 
         main_layout.addStretch(1)
 
-        self.setStyleSheet("""
-            QGroupBox {
-                border: 1px solid #555;
-                border-radius: 8px;
-                font-weight: bold;
-                color: #e0e0e0;
-                padding-top: 40px;
-                padding-bottom: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 5px;
-                background-color: #282828;
-                border-top-left-radius: 8px;
-                border-top-right-radius: 8px;
-                /* FIX: Increase padding-top here for more space below the title */
-                padding-top: 10px; /* You can adjust this value (e.g., 20px, 30px) */
-            }
-            QLabel {
-                color: #e0e0e0;
-                font-size: 14px;
-            }
-            QPushButton {
-                padding: 8px 15px;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-        """)
-
-    def _connect_signals(self):
-        self.play_button.clicked.connect(self.play_signal.emit)
-        self.stop_button.clicked.connect(self.stop_signal.emit)
+        self.setStyleSheet(_load_panel_qss())
 
-        self.grain_size_knob.valueChanged.connect(self._update_grain_size)
-        self.grain_density_knob.valueChanged.connect(self._update_grain_density)
-        self.pitch_shift_knob.valueChanged.connect(self._update_pitch_shift)
-        self.volume_knob.valueChanged.connect(self._update_volume)
-        self.start_position_knob.valueChanged.connect(self._update_start_position)
+    def _init_throttles(self):
+        # During a drag valueChanged fires at the mouse sample rate; throttling
+        # the downstream parameter signals bounds the engine updates per drag
+        # while the value labels keep tracking every tick. dragFinished flushes
+        # so the final knob position is always delivered.
+        self._grain_size_throttle = _ThrottledEmitter(self, self.grain_size_changed_signal.emit)
+        self._grain_density_throttle = _ThrottledEmitter(self, self.grain_density_changed_signal.emit)
+        self._pitch_shift_throttle = _ThrottledEmitter(self, self.pitch_shift_changed_signal.emit)
+        self._volume_throttle = _ThrottledEmitter(self, self.volume_changed_signal.emit)
+        self._start_position_throttle = _ThrottledEmitter(self, self.start_position_changed_signal.emit)
 
+    def _connect_signals(self):
+        # Everything here lives on the GUI thread, so request DirectConnection
+        # explicitly: the default AutoConnection resolves to Direct anyway but
+        # pays a thread-affinity check on every emit, and valueChanged fires
+        # at mouse-move rate during a drag.
+        direct = Qt.ConnectionType.DirectConnection
+
+        self.play_button.clicked.connect(self._on_play_clicked, direct)
+        self.stop_button.clicked.connect(self._on_stop_clicked, direct)
+
+        self.grain_size_knob.valueChanged.connect(self._update_grain_size, direct)
+        self.grain_density_knob.valueChanged.connect(self._update_grain_density, direct)
+        self.pitch_shift_knob.valueChanged.connect(self._update_pitch_shift, direct)
+        self.volume_knob.valueChanged.connect(self._update_volume, direct)
+        self.start_position_knob.valueChanged.connect(self._update_start_position, direct)
+
+        self.grain_size_knob.dragFinished.connect(self._grain_size_throttle.flush, direct)
+        self.grain_density_knob.dragFinished.connect(self._grain_density_throttle.flush, direct)
+        self.pitch_shift_knob.dragFinished.connect(self._pitch_shift_throttle.flush, direct)
+        self.volume_knob.dragFinished.connect(self._volume_throttle.flush, direct)
+        self.start_position_knob.dragFinished.connect(self._start_position_throttle.flush, direct)
+
+    # Decorated as pyqtSlot so PyQt connects to the C++ fast path instead of
+    # falling back to generic Python-callable dispatch on every emit. These
+    # slots fire at mouse-move rate during a knob drag, so the cheaper
+    # dispatch matters.
+    @pyqtSlot()
+    def _on_play_clicked(self):
+        self.play_signal.emit()
+
+    @pyqtSlot()
+    def _on_stop_clicked(self):
+        self.stop_signal.emit()
+
+    @pyqtSlot(int)
     def _update_grain_size(self, value: int):
-        self.grain_size_value_label.setText(f"{value}%")
-        self.grain_size_changed_signal.emit(value)
-
+        # Labels are only rewritten when the text actually changes; a Python
+        # string compare is far cheaper than a no-op setText invalidation.
+        text = f"{value}%"
+        if text != self.grain_size_value_label.text():
+            self.grain_size_value_label.setText(text)
+        self._grain_size_throttle.submit(value)
+
+    @pyqtSlot(int)
     def _update_grain_density(self, value: int):
-        self.grain_density_value_label.setText(str(value))
-        self.grain_density_changed_signal.emit(value)
+        text = str(value)
+        if text != self.grain_density_value_label.text():
+            self.grain_density_value_label.setText(text)
+        self._grain_density_throttle.submit(value)
 
+    @pyqtSlot(int)
     def _update_pitch_shift(self, value: int):
-        float_value = value / 10.0
-        self.pitch_shift_value_label.setText(f"{float_value:.1f}")
-        self.pitch_shift_changed_signal.emit(float_value)
-
+        # The knob carries deci-semitones, so the "X.Y" display falls out of
+        # integer divmod without going through float formatting.
+        whole, tenths = divmod(abs(value), 10)
+        sign = "-" if value < 0 else ""
+        text = f"{sign}{whole}.{tenths}"
+        if text != self.pitch_shift_value_label.text():
+            self.pitch_shift_value_label.setText(text)
+        self._pitch_shift_throttle.submit(value)
+
+    @pyqtSlot(int)
     def _update_volume(self, value: int):
-        self.volume_value_label.setText(str(value))
-        self.volume_changed_signal.emit(value)
+        text = str(value)
+        if text != self.volume_value_label.text():
+            self.volume_value_label.setText(text)
+        self._volume_throttle.submit(value)
 
+    @pyqtSlot(int)
     def _update_start_position(self, value: int):
-        self.start_position_value_label.setText(f"{value}%")
-        self.start_position_changed_signal.emit(value)
+        text = f"{value}%"
+        if text != self.start_position_value_label.text():
+            self.start_position_value_label.setText(text)
+        self._start_position_throttle.submit(value)
 
+    @pyqtSlot()
     def on_playback_started(self):
         self.play_button.setEnabled(False)
         self.stop_button.setEnabled(True)
 
+    @pyqtSlot()
     def on_playback_stopped(self):
         self.play_button.setEnabled(True)
         self.stop_button.setEnabled(False)
\ No newline at end of file
@@ -15,27 +15,14 @@ class EffectsPanel(QWidget):
         main_layout = QVBoxLayout()
         self.setLayout(main_layout)
 
+        # Group box and toggle styling lives in the application-level
+        # styles.qss (EffectsPanel QGroupBox / #reverbToggle rules).
         reverb_group = QGroupBox("Reverb")
-        reverb_group.setStyleSheet("""
-            QGroupBox {
-                border: 1px solid gray;
-                border-radius: 5px;
-                margin-top: 20px;
-                padding: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top center;
-                padding: 5px 10px;
-                font-weight: bold;
-                font-size: 14px;
-            }
-        """)
 
         reverb_layout = QVBoxLayout()
         self.reverb_toggle = QPushButton("Reverb On")
+        self.reverb_toggle.setObjectName("reverbToggle")
         self.reverb_toggle.setCheckable(True)
-        self.reverb_toggle.setStyleSheet("padding: 6px;")
         reverb_layout.addWidget(self.reverb_toggle, alignment=Qt.AlignmentFlag.AlignCenter)
 
         knobs_layout = QHBoxLayout()
@@ -60,15 +47,12 @@ class EffectsPanel(QWidget):
         knob.setFixedSize(64, 80)
 
         value_label = QLabel(f"{initial_value * 100:.0f}%")
+        # Styled by the #knobValueLabel rule in styles.qss: one parsed rule
+        # applied to all three labels by selector instead of three
+        # setStyleSheet calls, each of which recompiles the QSS and
+        # invalidates the label style cache.
+        value_label.setObjectName("knobValueLabel")
         value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        value_label.setStyleSheet("""
-            font-size: 12px;
-            color: #ffffff;
-            border: 1px solid #555;
-            border-radius: 6px;
-            padding: 4px;
-            background-color: #222;
-        """)
 
         layout.addWidget(knob, alignment=Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(value_label)
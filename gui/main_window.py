@@ -1,10 +1,11 @@
 import os
+from pathlib import Path
 
 from PyQt6.QtWidgets import (
-    QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QMessageBox,
+    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QMessageBox,
     QLabel, QStackedWidget  # NEW: Import QStackedWidget for overlay
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QObject, QRunnable, QThreadPool
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QKeySequence, QShortcut
 
 # Import components from other modules
@@ -16,6 +17,47 @@ from audio.granulator_engine import GranulatorEngine
 from audio.audio_player import AudioPlayer
 from utils.constants import DEFAULT_SAMPLE_RATE
 
+_AUDIO_EXTS = frozenset({'.wav', '.mp3', '.flac', '.ogg'})
+
+# Application-wide stylesheet (window chrome, drag overlay, effects panel),
+# parsed by Qt exactly once at startup instead of per-widget setStyleSheet
+# calls that each trigger their own repolish pass.
+_APP_QSS_PATH = Path(__file__).with_name("styles.qss")
+
+
+def _apply_app_stylesheet():
+    app = QApplication.instance()
+    if app is not None and not app.styleSheet():
+        app.setStyleSheet(_APP_QSS_PATH.read_text())
+
+
+class _AudioLoadSignals(QObject):
+    # (audio_data, sample_rate, filepath, peaks); data/rate/peaks are None
+    # on failure.
+    loaded = pyqtSignal(object, object, str, object)
+
+
+class _AudioLoadWorker(QRunnable):
+    """
+    Decodes an audio file on a QThreadPool thread so the event loop never
+    blocks on disk I/O or libsndfile/librosa decoding. The result is
+    delivered back to the GUI thread via a queued signal.
+    """
+
+    def __init__(self, filepath: str):
+        super().__init__()
+        self.signals = _AudioLoadSignals()
+        self._filepath = filepath
+
+    def run(self):
+        audio_data, sample_rate = AudioLoader.load_audio(self._filepath)
+        # The peak-envelope reduction streams the whole buffer twice, so it
+        # belongs here with the decode rather than on the GUI thread.
+        peaks = None
+        if audio_data is not None and len(audio_data) > 0:
+            peaks = WaveformViewer.compute_peaks(audio_data)
+        self.signals.loaded.emit(audio_data, sample_rate, self._filepath, peaks)
+
 
 class MainWindow(QMainWindow):
     """
@@ -24,10 +66,11 @@ class MainWindow(QMainWindow):
     between GUI and audio processing components.
     """
 
-    audio_loaded_signal = pyqtSignal(object, int)
+    audio_loaded_signal = pyqtSignal(object, int, object)
 
     def __init__(self):
         super().__init__()
+        _apply_app_stylesheet()
         self.setWindowTitle("Synthesis")
         self.setGeometry(100, 100, 600, 400)
 
@@ -40,9 +83,20 @@ class MainWindow(QMainWindow):
         self.audio_player = AudioPlayer(self.granulator_engine)
 
         self.playback_timer = QTimer(self)
-        self.playback_timer.setInterval(100)  # Increased interval for better responsiveness
+        self.playback_timer.setInterval(33)  # ~30 fps for smooth cursor motion
+        # Coarse timers may fire up to 5% late and drift; the precise type
+        # keeps cursor steps evenly spaced.
+        self.playback_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.playback_timer.timeout.connect(self._update_playback_cursor)
 
+        # Coalesces bursts of knob changes into one overlay redraw per
+        # event-loop turn: slots only arm this zero-interval single-shot
+        # timer, and _do_visual_update reads the knobs once when it fires.
+        self._visual_update_timer = QTimer(self)
+        self._visual_update_timer.setSingleShot(True)
+        self._visual_update_timer.setInterval(0)
+        self._visual_update_timer.timeout.connect(self._do_visual_update)
+
         self.shortcut = QShortcut(QKeySequence(Qt.Key.Key_Space), self)
         self.shortcut.activated.connect(self._toggle_playback_with_spacebar)
 
@@ -51,11 +105,7 @@ class MainWindow(QMainWindow):
 
         # Initial visualization update (for empty state or default loaded audio)
         # This is called once on startup to set the initial state of visuals.
-        self.waveform_viewer.update_granulation_visuals(
-            self.controls_panel.start_position_knob.value(),
-            self.controls_panel.grain_size_knob.value(),
-            0.0
-        )
+        self._do_visual_update()
 
     def _init_ui(self):
         central_widget = QWidget()
@@ -77,18 +127,8 @@ class MainWindow(QMainWindow):
 
         # Create the drag and drop label and add it as the second (top) widget
         self.drag_drop_label = QLabel("Drag & Drop an Audio File (WAV, MP3) Here")
+        self.drag_drop_label.setObjectName("dragDropLabel")  # Styled in styles.qss
         self.drag_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.drag_drop_label.setStyleSheet("""
-            QLabel {
-                font-size: 20px;
-                color: #888;
-                padding: 10px;
-                border: 2px dashed #666;
-                border-radius: 10px;
-                margin: 20px;
-                background-color: rgba(42, 42, 42, 0.8); /* Semi-transparent overlay */
-            }
-        """)
         self.waveform_stack.addWidget(self.drag_drop_label)
 
         # Initially show the drag_drop_label (index 1)
@@ -98,7 +138,8 @@ class MainWindow(QMainWindow):
 
         # 2. Controls Panel
         self.controls_panel = ControlsPanel()
-        self.controls_panel.setStyleSheet("border: 1px solid #444; border-radius: 8px; background-color: #333;")
+        # The panel frame styling lives in controls_panel.qss; setting another
+        # stylesheet here would replace it and trigger a second repolish pass.
         self.controls_panel.setContentsMargins(0, 0, 0, 0)
         controls_wrapper = QWidget()
         controls_layout = QVBoxLayout(controls_wrapper)
@@ -111,24 +152,16 @@ class MainWindow(QMainWindow):
         #self.effects_panel.setStyleSheet("border: 1px solid #444; border-radius: 8px; background-color: #333;")
         #main_layout.addWidget(self.effects_panel, 1)
 
-        # Set a dark theme for the window
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #1e1e1e;
-                color: #e0e0e0;
-            }
-            QWidget {
-                background-color: #282828;
-                color: #e0e0e0;
-            }
-            QLabel {
-                color: #e0e0e0;
-            }
-        """)
+        # The dark window theme comes from the application-level styles.qss.
 
     def _connect_signals(self):
         self.audio_loaded_signal.connect(self.waveform_viewer.update_waveform)
 
+        # The panel emits this once during its own construction (before we are
+        # connected), so apply the snapshot directly as well.
+        self.controls_panel.parameters_initialized_signal.connect(self._apply_initial_parameters)
+        self._apply_initial_parameters(self.controls_panel.current_parameters())
+
         self.controls_panel.play_signal.connect(self._start_playback_and_timer)
         self.controls_panel.stop_signal.connect(self._stop_playback_and_timer)
         self.controls_panel.grain_size_changed_signal.connect(self.granulator_engine.set_grain_length_percentage)
@@ -137,41 +170,41 @@ class MainWindow(QMainWindow):
         self.controls_panel.volume_changed_signal.connect(self.audio_player.set_volume)
         self.controls_panel.start_position_changed_signal.connect(self.granulator_engine.set_start_position_percentage)
 
-        self.audio_player.playback_started_signal.connect(self.controls_panel.on_playback_started)
-        self.audio_player.playback_stopped_signal.connect(self.controls_panel.on_playback_stopped)
+        # Explicitly queued: should these ever be emitted from the producer
+        # thread, the slot must run as a GUI event-loop dispatch, never
+        # synchronously on the audio path.
+        queued = Qt.ConnectionType.QueuedConnection
+        self.audio_player.playback_started_signal.connect(self.controls_panel.on_playback_started, queued)
+        self.audio_player.playback_stopped_signal.connect(self.controls_panel.on_playback_stopped, queued)
 
-        self.controls_panel.grain_size_changed_signal.connect(
-            lambda size: self.waveform_viewer.update_granulation_visuals(
-                self.controls_panel.start_position_knob.value(),
-                size,
-                self.audio_player.get_current_playback_time()
-            )
-        )
-        self.controls_panel.start_position_changed_signal.connect(
-            lambda pos: self.waveform_viewer.update_granulation_visuals(
-                pos,
-                self.controls_panel.grain_size_knob.value(),
-                self.audio_player.get_current_playback_time()
-            )
-        )
-        self.audio_player.playback_progress_signal.connect(
-            lambda current_time: self.waveform_viewer.update_granulation_visuals(
-                self.controls_panel.start_position_knob.value(),
-                self.controls_panel.grain_size_knob.value(),
-                current_time
-            )
-        )
+        # Both overlay-affecting knobs feed one coalescing scheduler instead
+        # of per-signal lambdas that each re-read every knob and force their
+        # own canvas redraw.
+        self.controls_panel.grain_size_changed_signal.connect(self._schedule_visual_update)
+        self.controls_panel.start_position_changed_signal.connect(self._schedule_visual_update)
 
     def dragEnterEvent(self, event: QDragEnterEvent):
+        # The URL check runs once per drag; dragMoveEvent below reuses the
+        # cached verdict for every subsequent mouse sample of the same drag.
+        self._drag_accepted = False
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
                 if url.isLocalFile():
                     filepath = url.toLocalFile()
-                    if filepath.lower().endswith(('.wav', '.mp3', '.flac', '.ogg')):
+                    # splitext + set membership: only the short extension is
+                    # lowercased, not the whole path.
+                    if os.path.splitext(filepath)[1].lower() in _AUDIO_EXTS:
+                        self._drag_accepted = True
                         event.acceptProposedAction()
                         return
         event.ignore()
 
+    def dragMoveEvent(self, event):
+        if self._drag_accepted:
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
     def dropEvent(self, event: QDropEvent):
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
@@ -186,40 +219,67 @@ class MainWindow(QMainWindow):
         # Hide the drag and drop overlay by showing the waveform viewer
         self.waveform_stack.setCurrentIndex(0)  # Show WaveformViewer (index 0)
 
-        audio_data, sample_rate = AudioLoader.load_audio(filepath)
+        # Decode on a worker thread; _on_audio_loaded picks up the result.
+        # The GUI stays responsive while multi-megabyte files are read.
+        # Workers finish in completion order, not request order, so remember
+        # which file was requested last; stale results are discarded.
+        self._pending_load_path = filepath
+        self.statusBar().showMessage(f"Loading {os.path.basename(filepath)}...")
+        self._load_worker = _AudioLoadWorker(filepath)
+        self._load_worker.signals.loaded.connect(self._on_audio_loaded)
+        QThreadPool.globalInstance().start(self._load_worker)
+
+    def _on_audio_loaded(self, audio_data, sample_rate, filepath: str, peaks):
+        if filepath != self._pending_load_path:
+            # A newer load was requested while this one was decoding; a slow
+            # first file must not overwrite the viewer/engine or raise error
+            # dialogs over the load the user actually asked for.
+            return
 
         if audio_data is not None and sample_rate is not None:
             self.audio_data = audio_data
             self.sample_rate = sample_rate
 
-            self.audio_loaded_signal.emit(self.audio_data, self.sample_rate)
-            self.granulator_engine.set_audio_source(self.audio_data, self.sample_rate)
+            self.audio_loaded_signal.emit(self.audio_data, self.sample_rate, peaks)
+            # Stop and join the producer thread BEFORE touching the engine:
+            # set_audio_source replaces the source buffers and grain pool in
+            # several stores, which is only safe while nothing is mixing.
             self.audio_player.reset_playback()
+            self.granulator_engine.set_audio_source(self.audio_data, self.sample_rate)
 
-            self.waveform_viewer.update_granulation_visuals(
-                self.controls_panel.start_position_knob.value(),
-                self.controls_panel.grain_size_knob.value(),
-                0.0
-            )
+            self._do_visual_update()
 
-            QMessageBox.information(self, "Audio Loaded", f"Successfully loaded: {os.path.basename(filepath)}")
+            # Non-modal confirmation: a blocking QMessageBox here stalled the
+            # event loop right when the waveform wants to draw.
+            self.statusBar().showMessage(f"Loaded: {os.path.basename(filepath)}", 5000)
         else:
             QMessageBox.warning(self, "Loading Error", f"Could not load audio file: {os.path.basename(filepath)}")
             # If loading fails, show the drag and drop overlay again
             self.waveform_stack.setCurrentIndex(1)  # Show Drag & Drop Label (index 1)
 
+    def _apply_initial_parameters(self, params: dict):
+        self.granulator_engine.configure(
+            grain_length_percentage=params["grain_size"],
+            grain_density=params["grain_density"],
+            pitch_shift_deci_semitones=params["pitch_shift"],
+            start_position_percentage=params["start_position"],
+        )
+        self.audio_player.set_volume(params["volume"])
+
     def _start_playback_and_timer(self):
         if self.audio_data is None:
             QMessageBox.warning(self, "No Audio", "Please load an audio file first.")
             return
 
         # Ensure audio player has the latest granulator engine parameters
-        # This is important if parameters were tweaked while stopped
-        self.granulator_engine.set_start_position_percentage(self.controls_panel.start_position_knob.value())
-        self.granulator_engine.set_grain_length_percentage(self.controls_panel.grain_size_knob.value())
-        self.granulator_engine.set_grain_density(self.controls_panel.grain_density_knob.value())
-        self.granulator_engine.set_pitch_shift(
-            self.controls_panel.pitch_shift_knob.value() / 10.0)  # Convert to float semitones
+        # This is important if parameters were tweaked while stopped.
+        # One configure call rebuilds and publishes the snapshot once.
+        self.granulator_engine.configure(
+            start_position_percentage=self.controls_panel.start_position_knob.value(),
+            grain_length_percentage=self.controls_panel.grain_size_knob.value(),
+            grain_density=self.controls_panel.grain_density_knob.value(),
+            pitch_shift_deci_semitones=self.controls_panel.pitch_shift_knob.value(),
+        )
 
         self.audio_player.play()
         self.playback_timer.start()
@@ -227,18 +287,22 @@ class MainWindow(QMainWindow):
     def _stop_playback_and_timer(self):
         self.audio_player.stop()
         self.playback_timer.stop()
-        self.waveform_viewer.update_granulation_visuals(
-            self.controls_panel.start_position_knob.value(),
-            self.controls_panel.grain_size_knob.value(),
-            self.audio_player.get_current_playback_time()
-        )
+        self._do_visual_update()
 
     def _update_playback_cursor(self):
-        current_time = self.audio_player.get_current_playback_time()
+        self._do_visual_update()
+
+    def _schedule_visual_update(self, *_):
+        # Signal payloads are ignored; the knobs are re-read once when the
+        # coalescing timer fires on the next event-loop turn.
+        if not self._visual_update_timer.isActive():
+            self._visual_update_timer.start()
+
+    def _do_visual_update(self):
         self.waveform_viewer.update_granulation_visuals(
             self.controls_panel.start_position_knob.value(),
             self.controls_panel.grain_size_knob.value(),
-            current_time
+            self.audio_player.get_current_playback_time()
         )
 
     def _toggle_playback_with_spacebar(self):
@@ -1,19 +1,50 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.patches as patches
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPainter, QFont  # NEW: Import QPainter and QFont for custom paintEvent
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
+
+
+# Maximum path simplification: lets Agg discard collinear micro-segments of
+# the envelope line before rasterizing (the default threshold of 1/9 keeps
+# most of them). Set once at import; this module owns the only figure.
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+
+# Upper bound on waveform columns: one min/max pair per column is plenty at
+# any realistic canvas width, and it decouples draw cost from clip length.
+_PEAK_COLUMNS = 2048
 
 
 class WaveformViewer(QWidget):
     """
     A PyQt widget that displays the waveform of an audio file using Matplotlib.
+
+    The raw audio is never plotted directly; it is reduced once per load to a
+    per-column min/max peak envelope (at most _PEAK_COLUMNS columns), so the
+    plot holds ~4k points regardless of whether the clip is two seconds or
+    ten minutes.
     """
 
+    @staticmethod
+    def compute_peaks(audio_data: np.ndarray, columns: int = _PEAK_COLUMNS):
+        """
+        Reduces audio to (mins, maxs) arrays with one entry per display
+        column. Pure vectorized NumPy: one reshape plus two SIMD reductions
+        streaming the buffer once each, no Python-level loop.
+        """
+        n = len(audio_data)
+        if n == 0:
+            return None
+        columns = min(columns, n)
+        samples_per_column = n // columns
+        usable = columns * samples_per_column
+        blocks = audio_data[:usable].reshape(columns, samples_per_column)
+        return blocks.min(axis=1), blocks.max(axis=1)
+
     def __init__(self):
         super().__init__()
         self.audio_data = None
@@ -29,10 +60,29 @@ class WaveformViewer(QWidget):
         self.grain_size_percentage = 50
         self.current_playback_pos_seconds = 0.0
 
-        # Matplotlib plot elements for dynamic updates (initialized to None)
-        self.start_pos_line = None
-        self.grain_region_patch = None
-        self.playback_cursor_line = None
+        # Loop region in seconds, cached by _draw_granulation_visuals so
+        # cursor-only ticks can reposition the cursor line without redoing
+        # the start-line/region geometry.
+        self._loop_start_s = 0.0
+        self._loop_end_s = 0.0
+
+        # y-limits cached whenever update_waveform sets them; get_ylim()
+        # triggers Axes introspection, which the per-tick overlay path
+        # should not pay for.
+        self._y_lo = 0.0
+        self._y_hi = 1.0
+
+        # Seconds per percentage point, refreshed per load; turns the
+        # percent-to-seconds conversions below into one multiply each.
+        self._dur_per_pct = 0.0
+
+        # Matplotlib plot elements for dynamic updates (created in _init_ui)
+
+        # Blitting state: the static scene (waveform, grid, spines) rendered
+        # once and captured as a pixel buffer. Overlay updates restore it and
+        # redraw only the three animated artists on top, instead of
+        # re-rasterizing the whole figure ~30 times a second.
+        self._background = None
 
         self._init_ui()  # This will now also call _draw_granulation_visuals
 
@@ -64,12 +114,71 @@ class WaveformViewer(QWidget):
         self.ax.grid(True, linestyle=':', alpha=0.6, color='#555')
 
         self.ax.set_title("No Audio Loaded", color='#e0e0e0')
+
+        # Persistent waveform artist: loads update its data in place rather
+        # than ax.clear()-ing, so the facecolor/spine/grid styling above is
+        # applied exactly once for the lifetime of the widget.
+        self._waveform_line, = self.ax.plot([], [], color='#00aaff', linewidth=0.5)
+        # Cheapest rasterization settings for the one dense line: no
+        # antialiasing (the zigzag is sub-pixel anyway), no pixel snapping,
+        # and butt/miter ends so Agg skips cap/join geometry per segment.
+        # The sparse overlay artists keep antialiasing.
+        self._waveform_line.set_antialiased(False)
+        self._waveform_line.set_snap(False)
+        self._waveform_line.set_solid_capstyle('butt')
+        self._waveform_line.set_solid_joinstyle('miter')
+
+        # Overlay artists created once here, hidden until audio loads; the
+        # per-frame path is then pure set_xdata/set_xy with no creation
+        # branches. All three are animated: excluded from full draws and
+        # rendered by _blit_overlay.
+        self.start_pos_line = self.ax.axvline(
+            x=0.0,
+            color='#FFA500',
+            linestyle='--',
+            linewidth=2,
+            label='Start Position',
+            visible=False,
+            animated=True
+        )
+        self.grain_region_patch = patches.Rectangle(
+            (0.0, 0.0), 0.0, 0.0,
+            facecolor='#00FFFF',
+            alpha=0.2,
+            edgecolor='none',
+            label='Granulation Region',
+            visible=False,
+            animated=True
+        )
+        self.ax.add_patch(self.grain_region_patch)
+        self.playback_cursor_line = self.ax.axvline(
+            x=0.0,
+            color='#FF0000',
+            linestyle='-',
+            linewidth=1.5,
+            label='Playback Cursor',
+            visible=False,
+            animated=True
+        )
+
         self.figure.tight_layout()
 
-        # Call _draw_granulation_visuals here to create the initial plot elements
-        # They will be hidden if no audio is loaded, but their objects will exist.
+        # Overlay text as a plain child label (styled via styles.qss) rather
+        # than a paintEvent override: Qt only paints it while visible, so the
+        # widget pays nothing per repaint once audio is loaded.
+        self._overlay_label = QLabel(self.overlay_text, self)
+        self._overlay_label.setObjectName("viewerOverlayLabel")
+        self._overlay_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._overlay_label.setVisible(self.show_overlay)
+
+        # Recapture the static background whenever a full draw happens (load,
+        # resize, tight_layout); the next overlay blit then restores from the
+        # fresh buffer.
+        self.canvas.mpl_connect('draw_event', self._on_canvas_draw)
+
+        # Initial pass just keeps the overlay hidden while no audio is loaded.
         self._draw_granulation_visuals()
-        self.canvas.draw()  # Draw the initial empty plot with hidden elements
+        self.canvas.draw_idle()  # Initial empty plot, deferred to first paint
 
         # self.setStyleSheet("""
         #     WaveformViewer {
@@ -86,107 +195,153 @@ class WaveformViewer(QWidget):
         """
         self.overlay_text = text
         self.show_overlay = bool(text)  # True if text is non-empty, False otherwise
-        self.update()  # Request a repaint to show/hide the overlay
+        self._overlay_label.setText(text)
+        self._overlay_label.setVisible(self.show_overlay)
 
-    def update_waveform(self, audio_data: np.ndarray, sample_rate: int):
+    @pyqtSlot(object, int, object)
+    def update_waveform(self, audio_data: np.ndarray, sample_rate: int, peaks=None):
+        """
+        Displays a new clip. `peaks` is an optional precomputed
+        (mins, maxs) pair from compute_peaks(); the load worker supplies it
+        so the two full passes over the buffer happen off the GUI thread.
+        """
         self.audio_data = audio_data
         self.sample_rate = sample_rate
 
-        self.ax.clear()
-
-        # Crucially, after ax.clear(), we must reset the references so _draw_granulation_visuals recreates them.
-        self.start_pos_line = None
-        self.grain_region_patch = None
-        self.playback_cursor_line = None
+        # No ax.clear(): the persistent line and overlay artists are updated
+        # in place, so the facecolor/spine/grid styling from _init_ui never
+        # needs reapplying. The cached blit background is stale either way.
+        self._background = None
 
         if self.audio_data is not None and self.sample_rate > 0 and len(self.audio_data) > 0:
-            if np.isnan(self.audio_data).any() or np.isinf(self.audio_data).any():
+            # Update the min/max peak envelope: for each column, a vertical
+            # zigzag between the block minimum and maximum. Visually
+            # equivalent to plotting every sample at sub-pixel widths, at a
+            # tiny fraction of the point count.
+            mins, maxs = peaks if peaks is not None else self.compute_peaks(self.audio_data)
+
+            # NaN/Inf propagate through min/max reductions, so checking the
+            # envelope validates every sample without the separate isnan and
+            # isinf full passes over the source buffer.
+            if not (np.isfinite(mins).all() and np.isfinite(maxs).all()):
                 print("Warning: Waveform data contains NaN or Inf values. Not plotting waveform.")
                 self.ax.set_title("Audio Data Error (NaN/Inf)", color='red')
-                self.canvas.draw()
+                self._waveform_line.set_data([], [])
+                self.canvas.draw_idle()
                 self.total_audio_duration_seconds = 0.0
                 return
 
             self.total_audio_duration_seconds = len(self.audio_data) / self.sample_rate
-            time = np.linspace(0, self.total_audio_duration_seconds, num=len(self.audio_data))
-
-            self.ax.plot(time, self.audio_data, color='#00aaff', linewidth=0.5)
-
-            # Removed redundant label and tick settings here to prevent resetting labels
-            # self.ax.set_xlabel("Time (s)", color='#e0e0e0')
-            # self.ax.set_ylabel("Amplitude", color='#e0e0e0')
-            # from matplotlib import rcParams
-            # rcParams.update({'font.size': 8})  # Smaller font for tick labels
-            # self.ax.tick_params(axis='both', which='major', labelsize=8, length=3)
+            columns = len(mins)
+            centers = np.linspace(0, self.total_audio_duration_seconds, num=columns)
+            x = np.repeat(centers, 2)
+            y = np.empty(columns * 2, dtype=np.float32)
+            y[0::2] = mins
+            y[1::2] = maxs
+            self._waveform_line.set_data(x, y)
+
+            self.ax.set_title("")
             self.ax.set_xlim(0, self.total_audio_duration_seconds)
-            y_min = np.min(self.audio_data)
-            y_max = np.max(self.audio_data)
+            y_min = float(mins.min())
+            y_max = float(maxs.max())
             padding = (y_max - y_min) * 0.1
             self.ax.set_ylim(y_min - padding, y_max + padding)
+            self._y_lo, self._y_hi = self.ax.get_ylim()
 
             # Hide overlay text when audio is loaded successfully
             self.set_overlay_text("")
 
         else:
+            self._waveform_line.set_data([], [])
             self.ax.set_title("No Audio Loaded", color='#e0e0e0')
             self.total_audio_duration_seconds = 0.0
             # Show overlay text if audio loading fails or no audio
             self.set_overlay_text("Drag & Drop an Audio File (WAV, MP3) Here")
 
-        self.ax.set_facecolor('#2a2a2a')
-        self.ax.spines['bottom'].set_color('#666')
-        self.ax.spines['top'].set_color('#666')
-        self.ax.spines['right'].set_color('#666')
-        self.ax.spines['left'].set_color('#666')
-        self.ax.grid(True, linestyle=':', alpha=0.6, color='#555')
+        self._dur_per_pct = self.total_audio_duration_seconds * 0.01
 
         self._draw_granulation_visuals()
-        self.figure.tight_layout()
-        self.canvas.draw()
-
+        # No tight_layout here: the axes draw no tick labels, so decoration
+        # extents never change after the one layout pass in _init_ui, and
+        # tight_layout measures every artist to find that out.
+        # draw_idle coalesces with any other pending draw in the load burst;
+        # the blit background is recaptured when the deferred draw fires.
+        self.canvas.draw_idle()
+
+    @pyqtSlot(int, int, float)
     def update_granulation_visuals(self, start_pos_perc: int, grain_size_perc: int,
                                    current_playback_pos_seconds: float = 0.0):
+        last_start = self.start_pos_percentage
+        last_grain = self.grain_size_percentage
+        last_cursor = self.current_playback_pos_seconds
         self.start_pos_percentage = start_pos_perc
         self.grain_size_percentage = grain_size_perc
         self.current_playback_pos_seconds = current_playback_pos_seconds
 
         if self.audio_data is not None and self.sample_rate > 0 and self.total_audio_duration_seconds > 0:
-            self._draw_granulation_visuals()
-            self.canvas.draw_idle()
+            region_unchanged = (start_pos_perc == last_start and
+                               grain_size_perc == last_grain)
+            if region_unchanged:
+                # Cursor-only tick (the 30 fps playback path): reposition one
+                # line against the cached loop region. If the cursor did not
+                # move either, skip the blit too.
+                if current_playback_pos_seconds == last_cursor:
+                    return
+                self._update_cursor_artist()
+            else:
+                self._draw_granulation_visuals()
         else:
-            # If no audio or invalid, hide any existing visuals
-            if self.start_pos_line: self.start_pos_line.set_visible(False)
-            if self.grain_region_patch: self.grain_region_patch.set_visible(False)
-            if self.playback_cursor_line: self.playback_cursor_line.set_visible(False)
+            # If no audio or invalid, hide the visuals
+            self.start_pos_line.set_visible(False)
+            self.grain_region_patch.set_visible(False)
+            self.playback_cursor_line.set_visible(False)
+        self._blit_overlay()
+
+    def _on_canvas_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        # Animated artists are skipped by the full draw; paint them into the
+        # renderer here so they are not missing until the next blit.
+        for artist in (self.grain_region_patch, self.start_pos_line,
+                       self.playback_cursor_line):
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+
+    def _blit_overlay(self):
+        """
+        Repaints just the overlay artists: restore the cached static
+        background, draw the three animated artists on top, and blit the
+        axes region to screen. Falls back to a full draw until the first
+        background capture exists.
+        """
+        if self._background is None:
             self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        # Region patch first so the lines stay on top of the shading.
+        for artist in (self.grain_region_patch, self.start_pos_line,
+                       self.playback_cursor_line):
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
 
     def _draw_granulation_visuals(self):
         if self.audio_data is None or self.total_audio_duration_seconds == 0:
             # Hide visuals if no audio is loaded.
-            if self.start_pos_line: self.start_pos_line.set_visible(False)
-            if self.grain_region_patch: self.grain_region_patch.set_visible(False)
-            if self.playback_cursor_line: self.playback_cursor_line.set_visible(False)
+            self.start_pos_line.set_visible(False)
+            self.grain_region_patch.set_visible(False)
+            self.playback_cursor_line.set_visible(False)
             return
 
-        start_pos_seconds = self.total_audio_duration_seconds * (self.start_pos_percentage / 100.0)
+        start_pos_seconds = self._dur_per_pct * self.start_pos_percentage
         start_pos_seconds = max(0.0, min(start_pos_seconds, self.total_audio_duration_seconds))
 
-        grain_length_seconds = self.total_audio_duration_seconds * (self.grain_size_percentage / 100.0)
+        grain_length_seconds = self._dur_per_pct * self.grain_size_percentage
         if grain_length_seconds <= 0.0:
             grain_length_seconds = 0.001
 
-        # --- Draw/Update Start Position Indicator ---
-        if self.start_pos_line is None:
-            self.start_pos_line = self.ax.axvline(
-                x=start_pos_seconds,
-                color='#FFA500',
-                linestyle='--',
-                linewidth=2,
-                label='Start Position'
-            )
-        else:
-            self.start_pos_line.set_xdata([start_pos_seconds])
-            self.start_pos_line.set_visible(True)
+        # --- Update Start Position Indicator ---
+        self.start_pos_line.set_xdata([start_pos_seconds])
+        self.start_pos_line.set_visible(True)
 
         # --- Draw/Update Granulation Region (Shaded Rectangle) ---
         region_start_s = start_pos_seconds
@@ -195,30 +350,27 @@ class WaveformViewer(QWidget):
         region_end_s = min(region_end_s, self.total_audio_duration_seconds)
         rect_width = max(0.0, region_end_s - region_start_s)
 
-        if self.grain_region_patch is None:
-            self.grain_region_patch = patches.Rectangle(
-                (region_start_s, self.ax.get_ylim()[0]),
-                rect_width,
-                self.ax.get_ylim()[1] - self.ax.get_ylim()[0],
-                facecolor='#00FFFF',
-                alpha=0.2,
-                edgecolor='none',
-                label='Granulation Region'
-            )
-            self.ax.add_patch(self.grain_region_patch)
-        else:
-            self.grain_region_patch.set_xy((region_start_s, self.ax.get_ylim()[0]))
-            self.grain_region_patch.set_width(rect_width)
-            self.grain_region_patch.set_height(
-                self.ax.get_ylim()[1] - self.ax.get_ylim()[0])
-            self.grain_region_patch.set_visible(True)
+        self.grain_region_patch.set_xy((region_start_s, self._y_lo))
+        self.grain_region_patch.set_width(rect_width)
+        self.grain_region_patch.set_height(self._y_hi - self._y_lo)
+        self.grain_region_patch.set_visible(True)
+
+        # Cache the region for cursor-only updates.
+        self._loop_start_s = start_pos_seconds
+        self._loop_end_s = region_end_s
 
-        # --- Draw/Update Playback Cursor (Moving Vertical Line) ---
+        self._update_cursor_artist()
+
+    def _update_cursor_artist(self):
+        """
+        Repositions the playback cursor line against the cached loop region.
+        This is the only geometry the 30 fps cursor tick needs to touch.
+        """
         playback_cursor_s = 0.0
 
         if self.total_audio_duration_seconds > 0:
-            loop_start_s = start_pos_seconds
-            loop_end_s = region_end_s
+            loop_start_s = self._loop_start_s
+            loop_end_s = self._loop_end_s
 
             loop_duration_s = max(0.001, loop_end_s - loop_start_s)
 
@@ -227,34 +379,21 @@ class WaveformViewer(QWidget):
             if current_pos_relative_to_loop_start < 0:
                 playback_cursor_s = loop_start_s
             else:
-                cursor_pos_in_loop = np.fmod(current_pos_relative_to_loop_start, loop_duration_s)
+                # Plain float modulo: np.fmod on Python scalars allocates a
+                # 0-d array per call, and both operands are non-negative here.
+                cursor_pos_in_loop = current_pos_relative_to_loop_start % loop_duration_s
                 playback_cursor_s = loop_start_s + cursor_pos_in_loop
 
             playback_cursor_s = max(loop_start_s, min(playback_cursor_s, loop_end_s))
 
         if playback_cursor_s >= 0 and playback_cursor_s <= self.total_audio_duration_seconds:
-            if self.playback_cursor_line is None:
-                self.playback_cursor_line = self.ax.axvline(
-                    x=playback_cursor_s,
-                    color='#FF0000',
-                    linestyle='-',
-                    linewidth=1.5,
-                    label='Playback Cursor'
-                )
-            else:
-                self.playback_cursor_line.set_xdata([playback_cursor_s])
-                self.playback_cursor_line.set_visible(True)
+            self.playback_cursor_line.set_xdata([playback_cursor_s])
+            self.playback_cursor_line.set_visible(True)
         else:
-            if self.playback_cursor_line:
-                self.playback_cursor_line.set_visible(False)
-
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        if self.show_overlay and self.overlay_text:
-            painter = QPainter(self)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            painter.setPen(Qt.GlobalColor.gray)
-            font = painter.font()
-            font.setPointSize(16)
-            painter.setFont(font)
-            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.overlay_text)
\ No newline at end of file
+            self.playback_cursor_line.set_visible(False)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # The overlay label floats over the canvas, so it tracks the widget
+        # rect by hand instead of living in the layout.
+        self._overlay_label.setGeometry(self.rect())
\ No newline at end of file
@@ -1,5 +1,6 @@
 # In GranulatorApp/main.py
 
+import os
 import sys
 from PyQt6.QtWidgets import QApplication
 from gui.main_window import MainWindow
@@ -8,6 +9,11 @@ import cProfile
 import pstats
 import signal  # NEW: Import signal module
 
+# Profiling is opt-in: cProfile hooks every Python call, which taxes a GUI
+# app full of Qt signal callbacks by tens of percent. Run with
+# GRANULATOR_PROFILE=1 to enable it (or use py-spy, which needs no flag).
+PROFILING = bool(os.environ.get("GRANULATOR_PROFILE"))
+
 
 def main():
     app = QApplication(sys.argv)
@@ -37,6 +43,10 @@ def signal_handler(sig, frame):
 
 
 if __name__ == "__main__":
+    if not PROFILING:
+        main()
+        sys.exit(0)
+
     profiler = cProfile.Profile()
 
     # NEW: Register the signal handler BEFORE enabling the profiler and running app
@@ -66,4 +76,4 @@ if __name__ == "__main__":
                 stats.sort_stats('tottime')
                 stats.print_stats(20)
             except Exception as e:
-                print(f"Error dumping profile on normal exit: {e}")
\ No newline at end of file
+                print(f"Error dumping profile on normal exit: {e}")